@@ -3,10 +3,11 @@
 import logging
 from pathlib import Path
 
-from src.data_anonymization import anonymize_person
+from src.data_anonymization import anonymize_batch
 from src.database import create_db, get_db_url
 from src.fetch_data import fetch_persons
 from src.generate_report import generate_report
+from src.pipeline import iterate_in_background
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -24,17 +25,16 @@ def main():
     db = create_db(get_db_url(DB_PATH))
     logger.info(f"Database initialized at {DB_PATH}")
 
-    # Fetch and anonymize data
+    # Fetch, anonymize, and save data as overlapping stages: requests run on the fetch thread pool,
+    # batches are anonymized on a background thread, and rows are written on this thread
     num_persons = 30000
     logger.info(f"Starting data fetch and anonymization for {num_persons} persons")
-    persons = fetch_persons(quantity=30000)
-    if not persons:
+    anonymized_batches = (anonymize_batch(batch) for batch in fetch_persons(quantity=num_persons))
+    anonymized_persons = (row for batch in iterate_in_background(anonymized_batches) for row in batch)
+    num_written = db.write_persons(anonymized_persons)
+    if not num_written:
         raise ValueError("No valid person data fetched from API")
-    anonymized_persons = [anonymize_person(person) for person in persons]
-    logger.info(f"Found and anonymized {len(anonymized_persons)} persons - {len(anonymized_persons)/num_persons*100}%")
-
-    # Save to database
-    db.write_persons(anonymized_persons)
+    logger.info(f"Found and anonymized {num_written} persons - {num_written/num_persons*100}%")
     logger.info("Data successfully saved to database")
 
     # Generate report
@@ -1,80 +1,132 @@
 """Data anonymization functions."""
 
 import logging
-from datetime import datetime
+import re
+from datetime import date, datetime
 
-from email_validator import EmailNotValidError, validate_email
-
-from src.database import AnonymizedPerson
-from src.fetch_data import Person
+from src.database import AnonymizedPersonRow, age_group_label
+from src.fetch_data import Person, parse_birthday
 
 logger = logging.getLogger(__name__)
 
+# local part: no whitespace/@, no leading, trailing or consecutive dots
+# domain: two or more dot-separated alphanumeric labels, hyphens allowed inside a label;
+# the last label must start with a letter, which rejects IP addresses and numeric TLDs
+_EMAIL_RE = re.compile(
+    r"[^\s@.]+(?:\.[^\s@.]+)*@((?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)+[A-Za-z](?:[A-Za-z0-9-]*[A-Za-z0-9])?)"
+)
+
 
-def calculate_age_group(birthday: str) -> str | None:
+def calculate_age_decade(birthday: str, today: date | None = None) -> int | None:
     """
-    Calculate age group from birthday in format YYYY-MM-DD.
+    Calculate the lower bound of the age group from birthday in format YYYY-MM-DD.
 
     Args:
         birthday: Date string in YYYY-MM-DD format
+        today: Reference date for the age; defaults to the current date. Pass it in
+            when calculating many age groups to avoid a clock read per call.
 
     Returns:
-        Age group string in format [X-Y] where X and Y are multiples of 10
+        Age rounded down to a multiple of 10, or None if birthday is invalid
 
     Raises:
         ValueError: If birthday is in the future
     """
     try:
-        birth_date = datetime.strptime(birthday, "%Y-%m-%d")
+        birth_date = parse_birthday(birthday)
     except ValueError as e:
         logger.error(f"Error calculating age group: {e}")
         return None
 
-    today = datetime.now()
+    if today is None:
+        today = datetime.now().date()
 
     if birth_date > today:
         raise ValueError(f"Birthday {birthday} is in the future")
 
     age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
-    lower_bound = (age // 10) * 10
-    upper_bound = lower_bound + 10
+    return (age // 10) * 10
+
+
+def calculate_age_group(birthday: str, today: date | None = None) -> str | None:
+    """
+    Calculate age group from birthday in format YYYY-MM-DD.
+
+    Args:
+        birthday: Date string in YYYY-MM-DD format
+        today: Reference date for the age; defaults to the current date
+
+    Returns:
+        Age group string in format [X-Y] where X and Y are multiples of 10
 
-    return f"[{lower_bound}-{upper_bound}]"
+    Raises:
+        ValueError: If birthday is in the future
+    """
+    age_decade = calculate_age_decade(birthday, today)
+    return None if age_decade is None else age_group_label(age_decade)
 
 
 def extract_email_domain(email: str | None) -> str | None:
     """
-    Extract domain from email address using email-validator for robust validation.
+    Extract domain from email address.
+
+    ASCII addresses are decided by a precompiled regex alone, which covers practically all
+    API data. Only non-ASCII addresses with a single @ (e.g. internationalized domains) and
+    punycode ("xn--") domains fall through to the slower, allocation-heavy email-validator,
+    which is imported on first use. It decodes punycode, so "xn--bcher-kva.de" and "bücher.de"
+    both yield "bücher.de".
 
     Args:
         email: Complete email address or None
 
     Returns:
-        Email domain or None if email is invalid or None
+        Lowercased email domain or None if email is invalid or None
     """
     if email is None:
         return None
 
+    if match := _EMAIL_RE.fullmatch(email):
+        domain = match.group(1).lower()
+        if "xn--" not in domain:
+            return domain
+    elif email.isascii() or email.count("@") != 1:
+        return None
+
+    from email_validator import EmailNotValidError, validate_email
+
     try:
-        email_info = validate_email(email, check_deliverability=False)
-        return email_info.domain
+        return validate_email(email, check_deliverability=False).domain
     except EmailNotValidError:
         return None
 
 
-def anonymize_person(person: Person) -> AnonymizedPerson:
-    """Anonymize a person and return an SQLAlchemy model instance.
+def anonymize_person(person: Person, today: date | None = None) -> AnonymizedPersonRow:
+    """Anonymize a person and return a row ready for bulk insertion.
 
     Args:
         person: Person data from the API
+        today: Reference date for the age; defaults to the current date
+
+    Returns:
+        AnonymizedPersonRow for bulk insertion
+    """
+    return {
+        "age_decade": calculate_age_decade(person.birthday, today),
+        "email_domain": extract_email_domain(person.email),
+        "country": person.country,
+        "city": person.city,
+    }
+
+
+def anonymize_batch(persons: list[Person]) -> list[AnonymizedPersonRow]:
+    """Anonymize a batch of persons, reading the current date once for the whole batch.
+
+    Args:
+        persons: Person data from the API
 
     Returns:
-        AnonymizedPerson SQLAlchemy model instance
+        List of AnonymizedPersonRow for bulk insertion
     """
-    return AnonymizedPerson(
-        age_group=calculate_age_group(person.birthday),
-        email_domain=extract_email_domain(person.email),
-        country=person.address.country,
-        city=person.address.city,
-    )
+    today = datetime.now().date()
+    return [anonymize_person(person, today) for person in persons]
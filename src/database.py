@@ -1,41 +1,135 @@
 """Database operations using SQLAlchemy ORM."""
 
 import logging
+import sqlite3
 from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterable, Mapping, TypedDict, cast
 
-from sqlalchemy import Column, Integer, String, create_engine
-from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy import Engine, Integer, String, create_engine, event, inspect
+from sqlalchemy.orm import Mapped, Session, declarative_base, mapped_column, sessionmaker
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Tuned for bulk loads: WAL + synchronous=NORMAL avoids an fsync per commit,
+# and a 64MB page cache / 256MB mmap keeps the working set in memory.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+WRITE_CHUNK_SIZE = 1000  # rows per executemany call in `Database.write_persons`, one API batch
+
+
+# Precomputed "[X-Y]" labels indexed by decade, so labelling a row is a list lookup instead of formatting
+_AGE_GROUP_LABELS = [f"[{lower}-{lower + 10}]" for lower in range(0, 200, 10)]
+
 
 def get_db_url(dbpath: Path) -> str:
     return f"sqlite:///{dbpath}"
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record, pragmas: Mapping[str, object] = SQLITE_PRAGMAS) -> None:
+    """Apply `pragmas`, `SQLITE_PRAGMAS` by default, to every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in pragmas.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def age_group_label(age_decade: int) -> str:
+    """Map an age decade (0, 10, 20, ...) to its "[X-Y]" label."""
+    index = age_decade // 10
+    if index < len(_AGE_GROUP_LABELS):
+        return _AGE_GROUP_LABELS[index]
+    return f"[{age_decade}-{age_decade + 10}]"
+
+
 class AnonymizedPerson(Base):
     """SQLAlchemy model for anonymized person data."""
 
     __tablename__ = "anonymized_persons"
 
-    id = Column(Integer, primary_key=True)
-    age_group = Column(String)
-    email_domain = Column(String)
-    country = Column(String)
-    city = Column(String)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    age_decade: Mapped[int | None] = mapped_column(Integer)  # lower bound of the age group, compared as an integer
+    email_domain: Mapped[str | None] = mapped_column(String)
+    # Always set by the API, but nullable in the schema as before
+    country: Mapped[str] = mapped_column(String, nullable=True)
+    city: Mapped[str] = mapped_column(String, nullable=True)
+
+    @property
+    def age_group(self) -> str | None:
+        """Age group label in format [X-Y], derived from `age_decade` rather than stored."""
+        return None if self.age_decade is None else age_group_label(self.age_decade)
+
+
+class AnonymizedPersonRow(TypedDict):
+    """Plain row for bulk inserts into `AnonymizedPerson`, without ORM instance overhead."""
+
+    age_decade: int | None
+    email_domain: str | None
+    country: str
+    city: str
+
+
+_INSERT_COLUMNS = tuple(AnonymizedPersonRow.__annotations__)
+_INSERT_PERSON_SQL = (
+    f"INSERT INTO {AnonymizedPerson.__tablename__} ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+)
+_person_row = itemgetter(*_INSERT_COLUMNS)
+
+
+def _migrate_age_group_column(engine: Engine) -> None:
+    """Upgrade a table that stores "[X-Y]" `age_group` strings to the integer `age_decade` column.
+
+    `create_all` never alters an existing table, so a database written by an older version
+    is converted in place, keeping its rows: `age_decade` is added and filled from the
+    lower bound of each label, then `age_group` is dropped (needs SQLite 3.35+).
+    """
+    table = AnonymizedPerson.__tablename__
+    inspector = inspect(engine)
+    if not inspector.has_table(table):
+        return
+    columns = {column["name"] for column in inspector.get_columns(table)}
+    if "age_group" not in columns:
+        return
+
+    logger.warning(f"Migrating {table}: replacing the age_group column with age_decade")
+    with engine.begin() as conn:
+        if "age_decade" not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN age_decade INTEGER")
+            conn.exec_driver_sql(
+                f"UPDATE {table} SET age_decade = CAST(substr(age_group, 2, instr(age_group, '-') - 2) AS INTEGER) "
+                "WHERE age_group IS NOT NULL"
+            )
+        conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN age_group")
 
 
 class Database:
     """Handles database operations using SQLAlchemy."""
 
-    def __init__(self, db_url: str = "sqlite:///anonymized_data.db"):
-        """Initialize database connection."""
-        self.engine = create_engine(db_url)
-        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+    def __init__(self, db_url: str = "sqlite:///anonymized_data.db", engine: Engine | None = None):
+        """Initialize database connection.
+
+        Args:
+            db_url: SQLite database URL, used when no engine is given
+            engine: Existing engine to use as-is instead, e.g. a shared in-memory engine in
+                tests. `SQLITE_PRAGMAS` are only applied to engines created from `db_url`.
+        """
+        if engine is None:
+            engine = create_engine(db_url)
+            event.listen(engine, "connect", _set_sqlite_pragmas)
+        self.engine = engine
+        # Sessions only read, or write once before commit, so queries never need a flush first
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        _migrate_age_group_column(self.engine)
         Base.metadata.create_all(self.engine)
 
     @contextmanager
@@ -61,11 +155,53 @@ class Database:
         finally:
             session.close()
 
-    def write_persons(self, persons: list[AnonymizedPerson]) -> None:
-        """Write a list of anonymized persons to the database."""
-        with self.transaction() as session:
-            session.add_all(persons)
-        logger.info(f"Wrote {len(persons)} persons to the database")
+    @contextmanager
+    def raw_transaction(self) -> Generator[sqlite3.Cursor, None, None]:
+        """Context manager for a write transaction on the raw DBAPI connection.
+        Bypasses the ORM entirely; takes the write lock with `BEGIN IMMEDIATE`
+        and commits once, or rolls back on exception.
+
+        Yields:
+            sqlite3 cursor
+        """
+        connection = self.engine.raw_connection()
+        try:
+            # BEGIN IMMEDIATE is SQLite-only, so the DBAPI cursor is always a sqlite3 one
+            cursor = cast(sqlite3.Cursor, connection.cursor())
+            cursor.execute("BEGIN IMMEDIATE")
+            yield cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def write_persons(self, persons: Iterable[AnonymizedPersonRow], chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+        """Write anonymized persons to the database.
+
+        Rows are inserted with raw `sqlite3` executemany calls, skipping SQLAlchemy
+        statement compilation and ORM bookkeeping. `persons` is consumed lazily, so
+        a generator can stream rows in while it is still being produced. All chunks
+        share a single transaction, so SQLite commits exactly once.
+
+        Args:
+            persons: Anonymized person rows
+            chunk_size: Number of rows sent per executemany call
+
+        Returns:
+            Number of persons written
+        """
+        rows = map(_person_row, persons)
+        written = 0
+        with self.raw_transaction() as cursor:
+            while True:
+                cursor.executemany(_INSERT_PERSON_SQL, islice(rows, chunk_size))
+                if cursor.rowcount <= 0:
+                    break
+                written += cursor.rowcount
+        logger.info(f"Wrote {written} persons to the database")
+        return written
 
     def read_persons(self) -> list[AnonymizedPerson]:
         """Read all anonymized persons from the database."""
@@ -3,9 +3,10 @@
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any
+from datetime import date, datetime
+from typing import Any, Iterator
 
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -13,43 +14,60 @@ from urllib3.util.retry import Retry
 logger = logging.getLogger(__name__)
 
 MAX_API_QUANTITY = 1000  # defined by the Faker API
-MAX_WORKERS = 10  # number of concurrent threads
-
-
-@dataclass
-class Address:
-    """Address data from the API."""
+MAX_WORKERS = 32  # number of concurrent threads - requests are network-bound
+
+
+# Fields every API record must have to be accepted, even though only a few survive anonymization
+PERSON_FIELDS = frozenset(
+    {"id", "firstname", "lastname", "email", "phone", "birthday", "gender", "address", "website", "image"}
+)
+ADDRESS_FIELDS = frozenset(
+    {
+        "id",
+        "street",
+        "streetName",
+        "buildingNumber",
+        "city",
+        "zipcode",
+        "country",
+        "country_code",
+        "latitude",
+        "longitude",
+    }
+)
+
+
+@dataclass(slots=True)
+class Person:
+    """Person data from the API, reduced to the fields used for anonymization."""
 
-    id: int
-    street: str
-    streetName: str
-    buildingNumber: str
-    city: str
-    zipcode: str
+    email: str
+    birthday: str
     country: str
-    country_code: str
-    latitude: float
-    longitude: float
+    city: str
 
 
-@dataclass
-class Person:
-    """Person data from the API."""
+def parse_birthday(birthday: str) -> date:
+    """Parse a YYYY-MM-DD string.
 
-    id: int
-    firstname: str
-    lastname: str
-    email: str
-    phone: str
-    birthday: str
-    gender: str
-    address: Address
-    website: str
-    image: str
+    Zero-padded dates, i.e. everything the API sends, are parsed by slicing. Anything
+    else goes through `strptime`, which also accepts e.g. "1990-1-01".
+
+    Raises:
+        ValueError: If the string is not a valid YYYY-MM-DD date
+    """
+    if (
+        len(birthday) == 10
+        and birthday[4] == "-"
+        and birthday[7] == "-"
+        and (birthday[:4] + birthday[5:7] + birthday[8:]).isdigit()
+    ):
+        return date(int(birthday[:4]), int(birthday[5:7]), int(birthday[8:]))
+    return datetime.strptime(birthday, "%Y-%m-%d").date()
 
 
 def _validate_person(data: dict[str, Any]) -> Person | None:
-    """Validate and create a Person from dictionary data.
+    """Validate person dictionary data and pick the fields needed for anonymization.
 
     Args:
         data: Raw person dictionary from API
@@ -58,13 +76,16 @@ def _validate_person(data: dict[str, Any]) -> Person | None:
         Person object if valid, None if invalid
     """
     try:
-        # Validate birthday format, Address first
-        datetime.strptime(data["birthday"], "%Y-%m-%d")
-        address = Address(**data["address"])
-
-        # Create Person (will raise KeyError if missing fields)
-        return Person(**{**data, "address": address})
-    except (KeyError, TypeError, ValueError) as e:
+        # Validate required fields and birthday format before building the Person
+        if missing := PERSON_FIELDS - data.keys():
+            raise KeyError(f"Missing person fields: {sorted(missing)}")
+        address = data["address"]
+        if missing := ADDRESS_FIELDS - address.keys():
+            raise KeyError(f"Missing address fields: {sorted(missing)}")
+        parse_birthday(data["birthday"])
+
+        return Person(email=data["email"], birthday=data["birthday"], country=address["country"], city=address["city"])
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
         logger.warning(f"Invalid person data: {e}")
         return None
 
@@ -76,18 +97,18 @@ def validate_response(response_data: dict[str, Any]) -> list[Person]:
     1. Validates response status is "OK"
     2. Validates data field is a list
     3. For each person in the data:
-        - Validates all required Person fields exist (id, firstname, lastname, etc.)
+        - Validates all required person fields exist (id, firstname, lastname, etc.)
         - Validates birthday format (YYYY-MM-DD)
-        - Validates all required Address fields exist (id, street, city, etc.)
-        - Validates field types via dataclasss constructor (e.g., id is int, latitude is float)
+        - Validates all required address fields exist (id, street, city, etc.)
+        - Keeps only the fields needed for anonymization (email, birthday, country, city)
 
     If any validation fails at any level:
     - Response status not "OK" -> returns empty list
     - Data field not a list -> returns empty list
-    - Missing Person field -> skips that person
+    - Missing person field -> skips that person
     - Invalid birthday format -> skips that person
-    - Missing Address field -> skips that person
-    - Invalid field type -> skips that person
+    - Missing address field -> skips that person
+    - Person or address not a dictionary -> skips that person
 
     Args:
         response_data: Raw API response dictionary containing:
@@ -120,10 +141,18 @@ def validate_response(response_data: dict[str, Any]) -> list[Person]:
 
 
 def _create_session() -> requests.Session:
-    """Create a requests session with retry policy for 5xx errors and rate limits."""
+    """Create a requests session with retry policy for 5xx errors and rate limits.
+
+    The connection pool is sized to `MAX_WORKERS` so every thread reuses a keep-alive
+    connection instead of opening (and discarding) new sockets.
+    """
     session = requests.Session()
+    # Explicit, even though requests already sends it by default - the JSON payloads compress well
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
     retry_strategy = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy, pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, pool_block=True
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
@@ -148,7 +177,7 @@ def _fetch_batch(session: requests.Session, batch_num: int, batch_size: int) ->
         response = session.get(base_url, params=params, timeout=30)
         response.raise_for_status()
 
-        valid_persons = validate_response(response.json())
+        valid_persons = validate_response(orjson.loads(response.content))
         logger.info(f"Batch {batch_num}: Successfully fetched {len(valid_persons)} valid persons")
         return valid_persons
 
@@ -160,16 +189,18 @@ def _fetch_batch(session: requests.Session, batch_num: int, batch_size: int) ->
         raise
 
 
-def fetch_persons(quantity: int) -> list[Person]:
+def fetch_persons(quantity: int) -> Iterator[list[Person]]:
     """Fetch person data from the Faker API using parallel requests.
 
+    Batches are yielded as soon as their request completes, so callers can process
+    and store each batch while the remaining requests are still in flight.
+
     Args:
         quantity: Number of persons to fetch
 
-    Returns:
-        list of Person objects from the API
+    Yields:
+        list of Person objects from the API, one list per completed batch
     """
-    all_persons = []
     valid_persons_count = 0
 
     # Calculate number of batches needed
@@ -177,8 +208,9 @@ def fetch_persons(quantity: int) -> list[Person]:
     logger.info(f"Making {num_batches} parallel requests to fetch {quantity} persons")
 
     # Execute requests in parallel
+    # Never start more threads than there are requests to make
     session = _create_session()
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, num_batches))) as executor:
         futures = []
         for i in range(num_batches):
             batch_size = min(MAX_API_QUANTITY, quantity - (i * MAX_API_QUANTITY))
@@ -189,11 +221,10 @@ def fetch_persons(quantity: int) -> list[Person]:
         for future in as_completed(futures):
             try:
                 batch_persons = future.result()
-                all_persons.extend(batch_persons)
-                valid_persons_count += len(batch_persons)
             except Exception as e:
                 logger.error(f"Error in batch processing: {e}")
                 continue  # Try to process remaining batches
+            valid_persons_count += len(batch_persons)
+            yield batch_persons
 
     logger.info(f"Total valid persons fetched: {valid_persons_count}")
-    return all_persons
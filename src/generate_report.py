@@ -2,75 +2,93 @@
 
 import logging
 from pathlib import Path
+from typing import NamedTuple
 
-from sqlalchemy import func
+from sqlalchemy import ColumnElement, func
 
 from src.database import AnonymizedPerson, Database, create_db, get_db_url
 
 logger = logging.getLogger(__name__)
 
 
-def calculate_gmail_users_germany_percentage(db: Database) -> float:
-    """Calculate percentage of users in Germany using Gmail."""
+GMAIL_DOMAIN = "gmail.com"
+OVER_60_AGE_DECADE = 60
+
+
+class GroupCount(NamedTuple):
+    """Number of persons sharing a country, Gmail usage, and age decade."""
+
+    country: str
+    is_gmail: bool
+    age_decade: int | None
+    num_persons: int
+
+
+def get_group_counts(db: Database) -> list[GroupCount]:
+    """Count persons per (country, uses Gmail, age decade) in a single table scan.
+
+    The result has at most #countries x 2 x #age decades rows, small enough that every
+    report statistic can be derived from it in Python without querying again.
+    """
     with db.transaction() as session:
-        total_users_germany = session.query(AnonymizedPerson).filter(AnonymizedPerson.country == "Germany").count()
-        if total_users_germany == 0:
-            return 0.0
-        gmail_users_germany = (
-            session.query(AnonymizedPerson)
-            .filter(AnonymizedPerson.country == "Germany", AnonymizedPerson.email_domain == "gmail.com")
-            .count()
+        is_gmail: ColumnElement[bool] = func.coalesce(AnonymizedPerson.email_domain == GMAIL_DOMAIN, False)
+        rows = (
+            session.query(AnonymizedPerson.country, is_gmail, AnonymizedPerson.age_decade, func.count())
+            .group_by(AnonymizedPerson.country, is_gmail, AnonymizedPerson.age_decade)
+            .all()
         )
+        return [GroupCount(country, bool(gmail), age_decade, count) for country, gmail, age_decade, count in rows]
 
-        return (gmail_users_germany / total_users_germany) * 100
+
+def calculate_gmail_users_germany_percentage(group_counts: list[GroupCount]) -> float:
+    """Calculate percentage of users in Germany using Gmail."""
+    total_users_germany = sum(group.num_persons for group in group_counts if group.country == "Germany")
+    if total_users_germany == 0:
+        return 0.0
+    gmail_users_germany = sum(
+        group.num_persons for group in group_counts if group.country == "Germany" and group.is_gmail
+    )
+    return (gmail_users_germany / total_users_germany) * 100
 
 
-def get_top_gmail_countries(db: Database, number_of_countries: int = 3) -> list[tuple[str, int]]:
+def get_top_gmail_countries(group_counts: list[GroupCount], number_of_countries: int = 3) -> list[tuple[str, int]]:
     """Get top countries using Gmail, including ties.
-    
+
     Args:
-        db: Database instance
+        group_counts: Person counts from `get_group_counts`
         number_of_countries: Minimum number of countries to return (more will be included if tied)
-        
+
     Returns:
         List of (country, count) tuples, including all countries tied for the last position
     """
-    with db.transaction() as session:
-        country_counts = (
-            session.query(AnonymizedPerson.country, func.count(AnonymizedPerson.id).label("count"))
-            .filter(AnonymizedPerson.email_domain == "gmail.com")
-            .group_by(AnonymizedPerson.country)
-            .order_by(func.count(AnonymizedPerson.id).desc())
-            .all()
-        )
+    country_counts: dict[str, int] = {}
+    for group in group_counts:
+        if group.is_gmail:
+            country_counts[group.country] = country_counts.get(group.country, 0) + group.num_persons
 
-        if not country_counts:
-            return []
+    if not country_counts:
+        return []
 
-        sorted_country_counts = sorted(country_counts, key=lambda x: x[1], reverse=True)
-        
-        # If we have fewer countries than requested, return all
-        if len(sorted_country_counts) <= number_of_countries:
-            return sorted_country_counts
-            
-        # Get the count of the last country that would be included
-        cutoff_count = sorted_country_counts[number_of_countries - 1][1]
-        
-        # Include all countries that have at least this count
-        return [x for x in sorted_country_counts if x[1] >= cutoff_count]
+    sorted_country_counts = sorted(country_counts.items(), key=lambda x: x[1], reverse=True)
 
+    # If we have fewer countries than requested, return all
+    if len(sorted_country_counts) <= number_of_countries:
+        return sorted_country_counts
 
-def count_gmail_users_over_60(db: Database) -> int:
+    # Get the count of the last country that would be included
+    cutoff_count = sorted_country_counts[number_of_countries - 1][1]
+
+    # Include all countries that have at least this count
+    return [x for x in sorted_country_counts if x[1] >= cutoff_count]
+
+
+def count_gmail_users_over_60(group_counts: list[GroupCount]) -> int:
     """Count users over 60 using Gmail."""
-    with db.transaction() as session:
-        return (
-            session.query(AnonymizedPerson)
-            .filter(
-                AnonymizedPerson.email_domain == "gmail.com",
-                AnonymizedPerson.age_group.in_(["[60-70]", "[70-80]", "[80-90]", "[90-100]"]),
-            )
-            .count()
-        )
+    return sum(
+        group.num_persons
+        for group in group_counts
+        if group.is_gmail and group.age_decade is not None and group.age_decade >= OVER_60_AGE_DECADE
+    )
 
 
 def generate_report(db_path: Path):
@@ -78,9 +96,11 @@ def generate_report(db_path: Path):
     db = create_db(get_db_url(db_path))
     logger.info(f"Database initialized at {db_path}")
 
-    gmail_users_germany_pct = calculate_gmail_users_germany_percentage(db)
-    top_gmail_countries = get_top_gmail_countries(db)
-    gmail_over_60 = count_gmail_users_over_60(db)
+    # One aggregated scan feeds all three statistics
+    group_counts = get_group_counts(db)
+    gmail_users_germany_pct = calculate_gmail_users_germany_percentage(group_counts)
+    top_gmail_countries = get_top_gmail_countries(group_counts, number_of_countries=3)
+    gmail_over_60 = count_gmail_users_over_60(group_counts)
 
     report = f"""
 Anonymized Data Statistics Report
@@ -100,4 +120,5 @@ Anonymized Data Statistics Report
 """
 
     print(report)
+    db.engine.dispose()
     logger.info("Report generated successfully")
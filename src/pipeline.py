@@ -0,0 +1,55 @@
+"""Helpers for overlapping the fetch, anonymize, and write stages of the pipeline."""
+
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+MAX_QUEUED_BATCHES = 4  # bounds memory to a few batches if the consumer falls behind
+
+_DONE = object()
+
+
+class _ProducerError:
+    """Wraps an exception raised on the producer thread so it can be re-raised by the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def iterate_in_background(iterable: Iterable[T], maxsize: int = MAX_QUEUED_BATCHES) -> Iterator[T]:
+    """Consume an iterable on a background thread and yield its items through a bounded queue.
+
+    The producer stage (e.g. fetching and anonymizing a batch) keeps running while the caller
+    works on the previous item (e.g. writing it to SQLite, which releases the GIL), so the
+    stages overlap instead of running back to back. Exceptions raised by the producer are
+    re-raised in the caller.
+
+    Args:
+        iterable: Items to produce on the background thread
+        maxsize: Maximum number of produced items waiting to be consumed
+
+    Yields:
+        Items of `iterable`, in order
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                items.put(item)
+        except BaseException as e:
+            items.put(_ProducerError(e))
+        else:
+            items.put(_DONE)
+
+    # Daemon, so a consumer that stops early cannot keep the process alive on a blocked put()
+    thread = threading.Thread(target=produce, name="pipeline-producer", daemon=True)
+    thread.start()
+
+    while (item := items.get()) is not _DONE:
+        if isinstance(item, _ProducerError):
+            raise item.error
+        yield item
+    thread.join()
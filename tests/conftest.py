@@ -0,0 +1,51 @@
+"""Shared test fixtures."""
+
+from functools import partial
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Engine, create_engine, delete, event
+from sqlalchemy.pool import StaticPool
+
+from src.database import AnonymizedPerson, Database, _set_sqlite_pragmas
+
+# Durability is irrelevant for throwaway test databases: no journal file, no fsync
+TEST_SQLITE_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+}
+
+
+@pytest.fixture
+def db_path(tmp_path) -> Path:
+    """Path to a database file in pytest's per-test temporary directory."""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture(scope="session")
+def memory_engine() -> Iterator[Engine]:
+    """Create one in-memory SQLite engine, with test PRAGMAs, shared by the whole test session."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    event.listen(engine, "connect", partial(_set_sqlite_pragmas, pragmas=TEST_SQLITE_PRAGMAS))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def session_db(memory_engine) -> Database:
+    """Create the schema once, on the shared in-memory engine, for every DB test."""
+    return Database(engine=memory_engine)
+
+
+@pytest.fixture
+def db(session_db) -> Iterator[Database]:
+    """Yield the shared test database and delete every row it holds after each test.
+
+    Rows are deleted rather than rolled back from a per-test SAVEPOINT, because
+    `Database.raw_transaction` begins and commits its own transaction on the raw connection.
+    """
+    yield session_db
+    with session_db.transaction() as session:
+        session.execute(delete(AnonymizedPerson))
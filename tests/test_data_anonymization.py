@@ -1,42 +1,18 @@
 """Tests for data anonymization functions."""
 
+from datetime import date
+
 import pytest
 from freezegun import freeze_time
 
 from src.data_anonymization import (
+    anonymize_batch,
     anonymize_person,
+    calculate_age_decade,
     calculate_age_group,
     extract_email_domain,
 )
-from src.database import AnonymizedPerson
-from src.fetch_data import Person, Address
-
-# Create a sample address for reuse in tests
-SAMPLE_ADDRESS = Address(
-    id="addr123",
-    street="123 Main St",
-    streetName="Main St",
-    buildingNumber="123",
-    city="New York",
-    zipcode="10001",
-    country="USA",
-    country_code="US",
-    latitude=40.7128,
-    longitude=-74.0060,
-)
-
-EMPTY_ADDRESS = Address(
-    id="",
-    street="",
-    streetName="",
-    buildingNumber="",
-    city="",
-    zipcode="",
-    country="",
-    country_code="",
-    latitude=0.0,
-    longitude=0.0,
-)
+from src.fetch_data import Person
 
 
 @pytest.mark.parametrize(
@@ -55,9 +31,16 @@ EMPTY_ADDRESS = Address(
         # Edge cases
         ("1900-01-01", "[120-130]", "2025-01-01"),
         ("2023-12-31", "[0-10]", "2025-01-01"),
+        ("1990-1-01", "[30-40]", "2025-01-01"),  # month not zero-padded
+        ("1990-01-1", "[30-40]", "2025-01-01"),  # day not zero-padded
         # Invalid formats
         ("invalid-date", None, "2025-01-01"),
         ("", None, "2025-01-01"),
+        ("2023-02-30", None, "2025-01-01"),  # day out of range
+        ("1990-13-01", None, "2025-01-01"),  # month out of range
+        ("1990/01/01", None, "2025-01-01"),  # wrong separator
+        ("19_0-01-01", None, "2025-01-01"),  # non-digit characters
+        ("1990-01-01T00:00", None, "2025-01-01"),  # trailing time
     ],
 )
 def test_calculate_age_group(birthday, expected_age_group, frozen_date):
@@ -80,6 +63,35 @@ def test_calculate_age_group_future_birthday(birthday, frozen_date):
         calculate_age_group(birthday)
 
 
+@pytest.mark.parametrize(
+    "birthday,today,expected_age_group",
+    [
+        ("1990-06-15", date(2025, 6, 14), "[30-40]"),  # day before 35th birthday
+        ("1990-06-15", date(2025, 6, 15), "[30-40]"),
+        ("1995-06-15", date(2025, 6, 14), "[20-30]"),  # day before 30th birthday
+        ("1995-06-15", date(2025, 6, 15), "[30-40]"),
+    ],
+)
+def test_calculate_age_group_with_reference_date(birthday, today, expected_age_group):
+    """Test age group calculation against an explicit reference date."""
+    assert calculate_age_group(birthday, today) == expected_age_group
+
+
+@pytest.mark.parametrize(
+    "birthday,expected_age_decade",
+    [("2025-01-01", 0), ("1995-06-15", 20), ("1960-01-01", 60), ("1900-01-01", 120), ("invalid-date", None)],
+)
+def test_calculate_age_decade(birthday, expected_age_decade):
+    """Test age decade calculation against a fixed reference date."""
+    assert calculate_age_decade(birthday, date(2025, 1, 1)) == expected_age_decade
+
+
+def test_calculate_age_group_future_birthday_with_reference_date():
+    """Test that birthdays after the reference date raise ValueError."""
+    with pytest.raises(ValueError, match="is in the future"):
+        calculate_age_group("2025-01-02", date(2025, 1, 1))
+
+
 def test_calculate_age_group_fails_with_none():
     """Test that None birthday raises TypeError."""
     with pytest.raises(TypeError):
@@ -97,9 +109,18 @@ def test_calculate_age_group_fails_with_none():
         ("email@subdomain.example.museum", "subdomain.example.museum"),
         ("user+filter@gmail.com", "gmail.com"),
         ("user.name@example.com", "example.com"),
+        ("User@Example.COM", "example.com"),  # domain is lowercased
+        ("user@my-domain.com", "my-domain.com"),
+        ("josé@example.com", "example.com"),  # non-ASCII local part stays on the regex path
+        ("user@bücher.de", "bücher.de"),  # internationalized domain falls back to email-validator
+        ("user@xn--bcher-kva.de", "bücher.de"),  # punycode is decoded to the same domain
+        ("user@XN--BCHER-KVA.DE", "bücher.de"),
+        ("user@xn--zz.de", None),  # invalid punycode label
         # Invalid email formats
         ("test@localhost", None),
         ("user@[123.123.123.123]", None),
+        ("user@123.123.123.123", None),  # unbracketed IP address
+        ("user@example.123", None),  # numeric top-level label
         ("@domain.com", None),  # Missing local part
         ("user@@domain.com", None),  # Double @
         ("user@", None),  # Missing domain
@@ -108,6 +129,11 @@ def test_calculate_age_group_fails_with_none():
         ("user@..com", None),  # Double dot
         ("user@domain.", None),  # Trailing dot
         (".user@domain.com", None),  # leading dot in local part
+        ("first..last@domain.com", None),  # consecutive dots in local part
+        ("user@-domain.com", None),  # label starts with hyphen
+        ("user name@domain.com", None),  # whitespace in local part
+        ("user@bücher", None),  # internationalized domain without a period
+        ("usér@@bücher.de", None),  # non-ASCII with double @
         ("no-at-symbol", None),
         ("", None),
         (None, None),
@@ -124,32 +150,32 @@ def test_extract_email_domain(email, expected_domain):
     "person_data,expected_anonymized,frozen_date",
     [
         (
-            Person(id="person123", firstname="John", lastname="Doe", email="john.doe@example.com", phone="1234567890", birthday="1990-01-01", gender="M", website="https://example.com", image="https://example.com/image.jpg", address=SAMPLE_ADDRESS),
-            AnonymizedPerson(age_group="[30-40]", email_domain="example.com", country="USA", city="New York"),
+            Person(email="john.doe@example.com", birthday="1990-01-01", country="USA", city="New York"),
+            {"age_decade": 30, "email_domain": "example.com", "country": "USA", "city": "New York"},
             "2025-01-01",
         ),
         # Test with empty values
         (
-            Person(id="empty123", firstname="", lastname="", email="@example.com", phone="", birthday="invalid-date", gender="", website="", image="", address=EMPTY_ADDRESS),
-            AnonymizedPerson(age_group=None, email_domain=None, country="", city=""),
+            Person(email="@example.com", birthday="invalid-date", country="", city=""),
+            {"age_decade": None, "email_domain": None, "country": "", "city": ""},
             "2025-01-01",
         ),
         # Test with missing email domain
         (
-            Person(id="person456", firstname="John", lastname="Doe", email="no-domain", phone="1234567890", birthday="1990-01-01", gender="F", website="https://example.com", image="https://example.com/image.jpg", address=SAMPLE_ADDRESS),
-            AnonymizedPerson(age_group="[30-40]", email_domain=None, country="USA", city="New York"),
+            Person(email="no-domain", birthday="1990-01-01", country="USA", city="New York"),
+            {"age_decade": 30, "email_domain": None, "country": "USA", "city": "New York"},
             "2025-01-01",
         ),
         # Test with different birth year
         (
-            Person(id="person789", firstname="John", lastname="Doe", email="john.doe@example.com", phone="1234567890", birthday="1980-01-01", gender="M", website="https://example.com", image="https://example.com/image.jpg", address=SAMPLE_ADDRESS),
-            AnonymizedPerson(age_group="[40-50]", email_domain="example.com", country="USA", city="New York"),
+            Person(email="john.doe@example.com", birthday="1980-01-01", country="USA", city="New York"),
+            {"age_decade": 40, "email_domain": "example.com", "country": "USA", "city": "New York"},
             "2025-01-01",
         ),
         # Test with future birth date
         (
-            Person(id="person101", firstname="John", lastname="Doe", email="john.doe@example.com", phone="1234567890", birthday="2025-01-01", gender="F", website="https://example.com", image="https://example.com/image.jpg", address=SAMPLE_ADDRESS),
-            AnonymizedPerson(age_group="[0-10]", email_domain="example.com", country="USA", city="New York"),
+            Person(email="john.doe@example.com", birthday="2025-01-01", country="USA", city="New York"),
+            {"age_decade": 0, "email_domain": "example.com", "country": "USA", "city": "New York"},
             "2025-01-01",
         ),
         # fmt: on
@@ -160,7 +186,23 @@ def test_anonymize_person(person_data, expected_anonymized, frozen_date):
     """Test complete person anonymization with frozen time for deterministic results."""
     with freeze_time(frozen_date):
         anonymized = anonymize_person(person_data)
-        assert anonymized.age_group == expected_anonymized.age_group
-        assert anonymized.email_domain == expected_anonymized.email_domain
-        assert anonymized.country == expected_anonymized.country
-        assert anonymized.city == expected_anonymized.city
+        assert anonymized == expected_anonymized
+
+
+@freeze_time("2025-01-01")
+def test_anonymize_batch():
+    """Test that batch anonymization matches per-person anonymization."""
+    persons = [
+        Person(email="john.doe@example.com", birthday="1990-01-01", country="USA", city="New York"),
+        Person(email="@example.com", birthday="invalid-date", country="", city=""),
+        Person(email="no-domain", birthday="1980-01-01", country="USA", city="New York"),
+    ]
+    assert anonymize_batch(persons) == [anonymize_person(person) for person in persons]
+    assert anonymize_batch([]) == []
+
+
+def test_anonymize_person_with_reference_date():
+    """Test that anonymization uses an explicit reference date for the age."""
+    person = Person(email="john.doe@example.com", birthday="1995-06-15", country="USA", city="New York")
+    assert anonymize_person(person, date(2025, 6, 14))["age_decade"] == 20
+    assert anonymize_person(person, date(2025, 6, 15))["age_decade"] == 30
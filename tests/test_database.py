@@ -1,12 +1,13 @@
 """Tests for database operations."""
 
-import os
-import tempfile
+import sqlite3
 from pathlib import Path
 
 import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
 
-from src.database import AnonymizedPerson, create_db, get_db_url
+from src.database import AnonymizedPerson, AnonymizedPersonRow, Database, age_group_label, create_db, get_db_url
 
 
 def test_get_db_url():
@@ -14,52 +15,88 @@ def test_get_db_url():
     assert get_db_url(dbpath) == "sqlite:///data/anonymized_data.db"
 
 
-@pytest.fixture
-def temp_db_path():
-    """Create a temporary database file path."""
-    temp_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
-    temp_db.close()
-    yield temp_db.name
-    try:
-        os.unlink(temp_db.name)
-    except OSError:
-        pass
+def test_row_type_matches_model_columns():
+    """Test that bulk insert rows cover every model column except the generated primary key."""
+    model_columns = {column.name for column in AnonymizedPerson.__table__.columns if not column.primary_key}
+    assert set(AnonymizedPersonRow.__annotations__) == model_columns
 
 
-@pytest.fixture
-def db(temp_db_path):
-    """Create a new database instance for each test."""
-    db = create_db(f"sqlite:///{temp_db_path}")
-    yield db
-    db.engine.dispose()
+@pytest.mark.parametrize(
+    "age_decade,expected_label",
+    [(0, "[0-10]"), (10, "[10-20]"), (120, "[120-130]"), (190, "[190-200]"), (200, "[200-210]")],
+)
+def test_age_group_label(age_decade, expected_label):
+    """Test decade labels from the precomputed table and beyond it."""
+    assert age_group_label(age_decade) == expected_label
 
 
-def test_database_creation(temp_db_path):
+def test_database_creation(db_path):
     """Test that database file is created."""
-    db = create_db(f"sqlite:///{temp_db_path}")
-    assert os.path.exists(temp_db_path)
+    db = create_db(f"sqlite:///{db_path}")
+    assert db_path.exists()
     # Verify table exists
     with db.transaction() as session:
         assert session.query(AnonymizedPerson).first() is None
     db.engine.dispose()
 
 
+def test_no_secondary_indexes(db) -> None:
+    """Test that bulk inserts maintain no indexes, since the report reads the whole table in one scan."""
+    assert inspect(db.engine).get_indexes("anonymized_persons") == []
+
+
+def test_database_migrates_age_group_column(db_path) -> None:
+    """Test that a table with the old "[X-Y]" age_group column is upgraded to age_decade, keeping its rows."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE anonymized_persons "
+            "(id INTEGER PRIMARY KEY, age_group VARCHAR, email_domain VARCHAR, country VARCHAR, city VARCHAR)"
+        )
+        conn.executemany(
+            "INSERT INTO anonymized_persons (age_group, email_domain, country, city) VALUES (?, ?, ?, ?)",
+            [("[60-70]", "gmail.com", "Germany", "Berlin"), ("[100-110]", None, "USA", "Boston"), (None, None, "", "")],
+        )
+    conn.close()
+
+    db = create_db(get_db_url(db_path))
+    columns = {column["name"] for column in inspect(db.engine).get_columns("anonymized_persons")}
+    assert columns == {column.name for column in AnonymizedPerson.__table__.columns}
+    assert [(person.age_decade, person.age_group) for person in db.read_persons()] == [
+        (60, "[60-70]"),
+        (100, "[100-110]"),
+        (None, None),
+    ]
+
+    db.write_persons([{"age_decade": 20, "email_domain": "example.com", "country": "UK", "city": "London"}])
+    assert len(db.read_persons()) == 4
+    db.engine.dispose()
+
+
+def test_database_uses_given_engine() -> None:
+    """Test that an existing engine is used as-is and gets the schema created on it."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    db = Database(engine=engine)
+    assert db.engine is engine
+    assert inspect(engine).has_table("anonymized_persons")
+    engine.dispose()
+
+
 def test_write_and_read_persons(db) -> None:
     """Test writing and reading persons from the database."""
     # Create test data
     persons = [
-        AnonymizedPerson(
-            age_group="[20-30]",
-            email_domain="example.com",
-            country="USA",
-            city="New York",
-        ),
-        AnonymizedPerson(
-            age_group="[30-40]",
-            email_domain="gmail.com",
-            country="UK",
-            city="London",
-        ),
+        {
+            "age_decade": 20,
+            "email_domain": "example.com",
+            "country": "USA",
+            "city": "New York",
+        },
+        {
+            "age_decade": 30,
+            "email_domain": "gmail.com",
+            "country": "UK",
+            "city": "London",
+        },
     ]
 
     # Write persons
@@ -85,12 +122,12 @@ def test_write_and_read_persons(db) -> None:
 def test_get_person(db) -> None:
     """Test retrieving a single person by ID."""
     # Create and save a person
-    person = AnonymizedPerson(
-        age_group="[20-30]",
-        email_domain="example.com",
-        country="USA",
-        city="New York",
-    )
+    person = {
+        "age_decade": 20,
+        "email_domain": "example.com",
+        "country": "USA",
+        "city": "New York",
+    }
     db.write_persons([person])
 
     # Retrieve and verify
@@ -102,16 +139,31 @@ def test_get_person(db) -> None:
     assert retrieved_person.city == "New York"
 
 
+def test_write_no_persons(db) -> None:
+    """Test that writing an empty list does not insert any rows."""
+    assert db.write_persons([]) == 0
+    assert db.read_persons() == []
+
+
 def test_get_nonexistent_person(db) -> None:
     """Test retrieving a nonexistent person."""
     assert db.get_person(999) is None
 
 
+def test_transaction_does_not_autoflush(db) -> None:
+    """Test that pending adds are only flushed on commit, not by queries inside the transaction."""
+    with db.transaction() as session:
+        session.add(AnonymizedPerson(email_domain="example.com", country="USA", city="New York"))
+        assert session.query(AnonymizedPerson).count() == 0
+
+    assert len(db.read_persons()) == 1
+
+
 def test_transaction_rollback(db) -> None:
     """Test transaction rollback on error."""
     # Create a person
     person = AnonymizedPerson(
-        age_group="[20-30]",
+        age_decade=20,
         email_domain="example.com",
         country="USA",
         city="New York",
@@ -125,3 +177,41 @@ def test_transaction_rollback(db) -> None:
 
     # Verify person was not saved
     assert db.get_person(1) is None
+
+
+def test_sqlite_pragmas_applied(db_path) -> None:
+    """Test that bulk-load PRAGMAs are applied to new connections of a file-backed database."""
+    db = create_db(get_db_url(db_path))
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+    db.engine.dispose()
+
+
+def test_given_engine_keeps_its_pragmas(db) -> None:
+    """Test that a given engine is not reconfigured with the bulk-load PRAGMAs."""
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "memory"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 0  # OFF, from the test engine
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5000])
+def test_write_persons_chunked(db, chunk_size) -> None:
+    """Test that chunked writes stream a generator and insert every row regardless of chunk size."""
+    persons = (
+        {"age_decade": 20, "email_domain": "example.com", "country": "USA", "city": f"City {i}"} for i in range(5)
+    )
+    assert db.write_persons(persons, chunk_size=chunk_size) == 5
+
+    assert [person.city for person in db.read_persons()] == [f"City {i}" for i in range(5)]
+
+
+def test_raw_transaction_rollback(db) -> None:
+    """Test that the raw write transaction rolls back on error."""
+    with pytest.raises(Exception):
+        with db.raw_transaction() as cursor:
+            cursor.execute("INSERT INTO anonymized_persons (country) VALUES ('USA')")
+            raise Exception("Test error")
+
+    assert db.read_persons() == []
@@ -2,222 +2,152 @@
 
 import pytest
 
-from src.fetch_data import Person, validate_response
-
-
-@pytest.mark.parametrize(
-    "test_id,response_data,expected_count",
-    [
-        (
-            "valid_single_person",
-            {
-                "status": "OK",
-                "code": 200,
-                "total": 1,
-                "data": [
-                    {
-                        "id": 1,
-                        "firstname": "John",
-                        "lastname": "Doe",
-                        "email": "john@example.com",
-                        "phone": "+1234567890",
-                        "birthday": "1990-01-01",
-                        "gender": "male",
-                        "website": "http://example.com",
-                        "image": "http://example.com/image.jpg",
-                        "address": {
-                            "id": 1,
-                            "street": "123 Main St",
-                            "streetName": "Main St",
-                            "buildingNumber": "123",
-                            "city": "Anytown",
-                            "zipcode": "12345",
-                            "country": "USA",
-                            "country_code": "US",
-                            "latitude": 42.123,
-                            "longitude": -71.123,
-                        },
-                    }
-                ],
-            },
-            1,
-        ),
-        ("invalid_status", {"status": "ERROR", "code": 500, "total": 0, "data": []}, 0),
-        (
-            "missing_required_person_field",
-            {
-                "status": "OK",
-                "code": 200,
-                "total": 1,
-                "data": [
-                    {
-                        "id": 1,
-                        "firstname": "John",
-                        # missing lastname
-                        "email": "john@example.com",
-                        "phone": "+1234567890",
-                        "birthday": "1990-01-01",
-                        "gender": "male",
-                        "website": "http://example.com",
-                        "image": "http://example.com/image.jpg",
-                        "address": {
-                            "id": 1,
-                            "street": "123 Main St",
-                            "streetName": "Main St",
-                            "buildingNumber": "123",
-                            "city": "Anytown",
-                            "zipcode": "12345",
-                            "country": "USA",
-                            "country_code": "US",
-                            "latitude": 42.123,
-                            "longitude": -71.123,
-                        },
-                    }
-                ],
-            },
-            0,
-        ),
-        (
-            "missing_required_address_field",
-            {
-                "status": "OK",
-                "code": 200,
-                "total": 1,
-                "data": [
-                    {
-                        "id": 1,
-                        "firstname": "John",
-                        "lastname": "Doe",
-                        "email": "john@example.com",
-                        "phone": "+1234567890",
-                        "birthday": "1990-01-01",
-                        "gender": "male",
-                        "website": "http://example.com",
-                        "image": "http://example.com/image.jpg",
-                        "address": {
-                            "id": 1,
-                            "street": "123 Main St",
-                            "streetName": "Main St",
-                            "buildingNumber": "123",
-                            # missing city
-                            "zipcode": "12345",
-                            "country": "USA",
-                            "country_code": "US",
-                            "latitude": 42.123,
-                            "longitude": -71.123,
-                        },
-                    }
-                ],
-            },
-            0,
-        ),
-        (
-            "invalid_birthday_format",
-            {
-                "status": "OK",
-                "code": 200,
-                "total": 1,
-                "data": [
-                    {
-                        "id": 1,
-                        "firstname": "John",
-                        "lastname": "Doe",
-                        "email": "john@example.com",
-                        "phone": "+1234567890",
-                        "birthday": "01-01-1990",  # wrong format
-                        "gender": "male",
-                        "website": "http://example.com",
-                        "image": "http://example.com/image.jpg",
-                        "address": {
-                            "id": 1,
-                            "street": "123 Main St",
-                            "streetName": "Main St",
-                            "buildingNumber": "123",
-                            "city": "Anytown",
-                            "zipcode": "12345",
-                            "country": "USA",
-                            "country_code": "US",
-                            "latitude": 42.123,
-                            "longitude": -71.123,
-                        },
-                    }
-                ],
-            },
-            0,
-        ),
-        ("invalid_data_type", {"status": "OK", "code": 200, "total": 1, "data": "not a list"}, 0),  # wrong type
-        (
-            "multiple_valid_persons",
-            {
-                "status": "OK",
-                "code": 200,
-                "total": 2,
-                "data": [
-                    {
-                        "id": 1,
-                        "firstname": "John",
-                        "lastname": "Doe",
-                        "email": "john@example.com",
-                        "phone": "+1234567890",
-                        "birthday": "1990-01-01",
-                        "gender": "male",
-                        "website": "http://example.com",
-                        "image": "http://example.com/image.jpg",
-                        "address": {
-                            "id": 1,
-                            "street": "123 Main St",
-                            "streetName": "Main St",
-                            "buildingNumber": "123",
-                            "city": "Anytown",
-                            "zipcode": "12345",
-                            "country": "USA",
-                            "country_code": "US",
-                            "latitude": 42.123,
-                            "longitude": -71.123,
-                        },
-                    },
-                    {
-                        "id": 2,
-                        "firstname": "Jane",
-                        "lastname": "Doe",
-                        "email": "jane@example.com",
-                        "phone": "+1234567891",
-                        "birthday": "1991-02-02",
-                        "gender": "female",
-                        "website": "http://example2.com",
-                        "image": "http://example.com/image2.jpg",
-                        "address": {
-                            "id": 2,
-                            "street": "456 Oak St",
-                            "streetName": "Oak St",
-                            "buildingNumber": "456",
-                            "city": "Othertown",
-                            "zipcode": "67890",
-                            "country": "Canada",
-                            "country_code": "CA",
-                            "latitude": 45.123,
-                            "longitude": -75.123,
-                        },
-                    },
-                ],
-            },
-            2,
-        ),
-    ],
+from src import fetch_data
+from src.fetch_data import MAX_WORKERS, Person, _create_session, _fetch_batch, fetch_persons, validate_response
+
+_ADDRESS = {
+    "id": 1,
+    "street": "123 Main St",
+    "streetName": "Main St",
+    "buildingNumber": "123",
+    "city": "Anytown",
+    "zipcode": "12345",
+    "country": "USA",
+    "country_code": "US",
+    "latitude": 42.123,
+    "longitude": -71.123,
+}
+
+_PERSON = {
+    "id": 1,
+    "firstname": "John",
+    "lastname": "Doe",
+    "email": "john@example.com",
+    "phone": "+1234567890",
+    "birthday": "1990-01-01",
+    "gender": "male",
+    "website": "http://example.com",
+    "image": "http://example.com/image.jpg",
+    "address": _ADDRESS,
+}
+
+_SECOND_PERSON = {
+    **_PERSON,
+    "id": 2,
+    "firstname": "Jane",
+    "email": "jane@example.com",
+    "phone": "+1234567891",
+    "birthday": "1991-02-02",
+    "gender": "female",
+    "website": "http://example2.com",
+    "image": "http://example.com/image2.jpg",
+    "address": {
+        **_ADDRESS,
+        "id": 2,
+        "street": "456 Oak St",
+        "streetName": "Oak St",
+        "buildingNumber": "456",
+        "city": "Othertown",
+        "zipcode": "67890",
+        "country": "Canada",
+        "country_code": "CA",
+        "latitude": 45.123,
+        "longitude": -75.123,
+    },
+}
+
+
+def _without(data: dict, key: str) -> dict:
+    """Copy of `data` with `key` removed."""
+    return {k: v for k, v in data.items() if k != key}
+
+
+def _ok_response(*persons) -> dict:
+    """Successful API response wrapping the given person dictionaries."""
+    return {"status": "OK", "code": 200, "total": len(persons), "data": list(persons)}
+
+
+# Bound once so the assertions map it over results without per-element global lookups
+_person_check = Person.__instancecheck__
+
+# Validated once at import and shared by the happy-path assertions below
+_VALID_RESULT = validate_response(_ok_response(_PERSON, _SECOND_PERSON))
+
+
+def test_validate_response_happy_path():
+    """Test that valid persons are all returned with the picked fields."""
+    assert len(_VALID_RESULT) == 2
+    assert all(map(_person_check, _VALID_RESULT))
+    assert _VALID_RESULT[0] == Person(email="john@example.com", birthday="1990-01-01", country="USA", city="Anytown")
+    assert _VALID_RESULT[1] == Person(
+        email="jane@example.com", birthday="1991-02-02", country="Canada", city="Othertown"
+    )
+
+
+_REJECTED_RESPONSE_CASES: tuple = (
+    ("invalid_status", {"status": "ERROR", "code": 500, "total": 0, "data": []}),
+    ("missing_required_person_field", _ok_response(_without(_PERSON, "lastname"))),
+    ("missing_required_address_field", _ok_response({**_PERSON, "address": _without(_ADDRESS, "city")})),
+    ("invalid_birthday_format", _ok_response({**_PERSON, "birthday": "01-01-1990"})),  # wrong format
+    ("invalid_data_type", {"status": "OK", "code": 200, "total": 1, "data": "not a list"}),  # wrong type
+    ("person_not_a_dict", _ok_response("not a dict")),
 )
-def test_validate_response(test_id: str, response_data: dict, expected_count: int):
-    """Test validate_response function with various test cases."""
-    result = validate_response(response_data)
-
-    assert len(result) == expected_count
-
-    if expected_count > 0:
-        # Verify all results are Person objects
-        assert all(isinstance(person, Person) for person in result)
-
-        # For multiple persons test case, verify specific fields
-        if test_id == "multiple_valid_persons":
-            assert result[0].firstname == "John"
-            assert result[1].firstname == "Jane"
-            assert result[0].address.country == "USA"
-            assert result[1].address.country == "Canada"
+
+
+@pytest.mark.parametrize("test_id,response_data", _REJECTED_RESPONSE_CASES)
+def test_validate_response_rejects(test_id: str, response_data: dict):
+    """Test that invalid responses and persons are rejected."""
+    assert validate_response(response_data) == []
+
+
+def test_validate_response_accepts_unpadded_birthday():
+    """Test that birthdays without zero-padded month or day are still accepted."""
+    assert len(validate_response(_ok_response({**_PERSON, "birthday": "1990-1-01"}))) == 1
+
+
+def test_validate_response_skips_only_invalid_persons():
+    """Test that one invalid person does not drop the valid persons around it."""
+    result = validate_response(_ok_response(_PERSON, _without(_PERSON, "email"), _SECOND_PERSON))
+    assert result == _VALID_RESULT
+
+
+def test_fetch_persons_yields_batches(monkeypatch):
+    """Test that fetch_persons yields one list per completed batch and skips failed batches."""
+
+    def fake_fetch_batch(session, batch_num, batch_size):
+        if batch_num == 2:
+            raise RuntimeError("API unavailable")
+        return [batch_num] * batch_size
+
+    monkeypatch.setattr(fetch_data, "_fetch_batch", fake_fetch_batch)
+
+    batches = list(fetch_persons(quantity=2500))
+
+    assert sorted(len(batch) for batch in batches) == [500, 1000]
+
+
+def test_create_session_pool_matches_workers():
+    """Test that the session pools one keep-alive connection per worker and requests compressed responses."""
+    session = _create_session()
+    adapter = session.get_adapter("https://fakerapi.it")
+
+    assert adapter._pool_maxsize == MAX_WORKERS
+    assert adapter._pool_block is True
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+def test_fetch_batch_parses_response_bytes():
+    """Test that _fetch_batch decodes the raw response body and validates it."""
+
+    class FakeResponse:
+        content = b'{"status": "OK", "code": 200, "total": 0, "data": []}'
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def get(self, url, params, timeout):
+            assert params["_quantity"] == 10
+            return FakeResponse()
+
+    assert _fetch_batch(FakeSession(), batch_num=1, batch_size=10) == []
@@ -1,42 +1,25 @@
 """Tests for report generation queries."""
 
-import os
-import tempfile
-from pathlib import Path
-
 import pytest
-from freezegun import freeze_time
-from sqlalchemy import create_engine
 
-from src.database import AnonymizedPerson, Base, Database
+from src.database import create_db, get_db_url
 from src.generate_report import (
+    GroupCount,
     calculate_gmail_users_germany_percentage,
-    get_top_gmail_countries,
     count_gmail_users_over_60,
     generate_report,
+    get_group_counts,
+    get_top_gmail_countries,
 )
 
-
-@pytest.fixture
-def db():
-    """Create a test database using a temporary file."""
-    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-    temp_db.close()
-    db_url = f"sqlite:///{temp_db.name}"
-    engine = create_engine(db_url)
-    Base.metadata.create_all(engine)
-    database = Database(db_url)
-    yield database
-    os.unlink(temp_db.name)
+# Column order of the (id, email_domain, country, age_decade) row tuples below
+_INSERT_SQL = "INSERT INTO anonymized_persons (id, email_domain, country, age_decade) VALUES (?, ?, ?, ?)"
 
 
-@pytest.fixture
-def db_path():
-    """Create a temporary database file and return its path."""
-    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-    temp_db.close()
-    yield Path(temp_db.name)
-    os.unlink(temp_db.name)
+def _insert_persons(db, rows):
+    """Insert person row tuples with one raw sqlite3 executemany, bypassing SQLAlchemy entirely."""
+    with db.raw_transaction() as cursor:
+        cursor.executemany(_INSERT_SQL, rows)
 
 
 @pytest.fixture
@@ -44,119 +27,87 @@ def sample_data(db):
     """Create sample data for testing."""
     test_data = [
         # German Gmail users
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="Germany", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="gmail.com", country="Germany", age_group="[60-70]"),
+        (1, "gmail.com", "Germany", 30),
+        (2, "gmail.com", "Germany", 60),
         # German non-Gmail users
-        AnonymizedPerson(id=3, email_domain="outlook.com", country="Germany", age_group="[20-30]"),
-        AnonymizedPerson(id=4, email_domain="yahoo.com", country="Germany", age_group="[40-50]"),
+        (3, "outlook.com", "Germany", 20),
+        (4, "yahoo.com", "Germany", 40),
         # Non-German Gmail users
-        AnonymizedPerson(id=5, email_domain="gmail.com", country="USA", age_group="[50-60]"),
-        AnonymizedPerson(id=6, email_domain="gmail.com", country="USA", age_group="[70-80]"),
-        AnonymizedPerson(id=7, email_domain="gmail.com", country="France", age_group="[80-90]"),
+        (5, "gmail.com", "USA", 50),
+        (6, "gmail.com", "USA", 70),
+        (7, "gmail.com", "France", 80),
         # Other users
-        AnonymizedPerson(id=8, email_domain="outlook.com", country="UK", age_group="[90-100]"),
-        AnonymizedPerson(id=9, email_domain="yahoo.com", country="Spain", age_group="[40-50]"),
+        (8, "outlook.com", "UK", 90),
+        (9, "yahoo.com", "Spain", 40),
     ]
 
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
     return test_data
 
 
-# Tests for calculate_gmail_users_germany_percentage
-def test_gmail_germany_percentage(db, sample_data):
-    """Test calculation of Gmail usage percentage in Germany."""
-    percentage = calculate_gmail_users_germany_percentage(db)
-    assert percentage == pytest.approx(50.0)  # 2 Gmail users out of 4 German users
-
-
-def test_gmail_germany_percentage_no_germans(db):
-    """Test Gmail percentage calculation with no German users."""
-    test_data = [
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="outlook.com", country="UK", age_group="[40-50]"),
-    ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
-
-    percentage = calculate_gmail_users_germany_percentage(db)
-    assert percentage == 0.0
-
+def test_report_queries_happy_path(db, sample_data):
+    """Test all three report statistics against the sample data, loaded and grouped once."""
+    group_counts = get_group_counts(db)
 
-def test_gmail_germany_percentage_empty_db(db):
-    """Test Gmail percentage calculation with empty database."""
-    percentage = calculate_gmail_users_germany_percentage(db)
-    assert percentage == 0.0
+    # 2 Gmail users out of 4 German users
+    assert calculate_gmail_users_germany_percentage(group_counts) == pytest.approx(50.0)
 
-
-# Tests for get_top_gmail_countries
-def test_top_gmail_countries(db, sample_data):
-    """Test getting top countries using Gmail."""
-    top_countries = get_top_gmail_countries(db)
+    top_countries = get_top_gmail_countries(group_counts)
     assert len(top_countries) == 3
     assert ("USA", 2) in top_countries
     assert ("Germany", 2) in top_countries
     assert ("France", 1) in top_countries
 
+    assert count_gmail_users_over_60(group_counts) == 3
 
+
+# Tests for get_top_gmail_countries
 def test_top_gmail_countries_with_ties(db):
     """Test getting top countries with tied counts."""
     test_data = [
         # Two countries tied for first (3 users)
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="gmail.com", country="USA", age_group="[40-50]"),
-        AnonymizedPerson(id=3, email_domain="gmail.com", country="USA", age_group="[50-60]"),
-        AnonymizedPerson(id=4, email_domain="gmail.com", country="Germany", age_group="[30-40]"),
-        AnonymizedPerson(id=5, email_domain="gmail.com", country="Germany", age_group="[40-50]"),
-        AnonymizedPerson(id=6, email_domain="gmail.com", country="Germany", age_group="[50-60]"),
+        (1, "gmail.com", "USA", 30),
+        (2, "gmail.com", "USA", 40),
+        (3, "gmail.com", "USA", 50),
+        (4, "gmail.com", "Germany", 30),
+        (5, "gmail.com", "Germany", 40),
+        (6, "gmail.com", "Germany", 50),
         # Two countries tied for second (2 users)
-        AnonymizedPerson(id=7, email_domain="gmail.com", country="France", age_group="[60-70]"),
-        AnonymizedPerson(id=8, email_domain="gmail.com", country="France", age_group="[70-80]"),
-        AnonymizedPerson(id=9, email_domain="gmail.com", country="UK", age_group="[60-70]"),
-        AnonymizedPerson(id=10, email_domain="gmail.com", country="UK", age_group="[70-80]"),
+        (7, "gmail.com", "France", 60),
+        (8, "gmail.com", "France", 70),
+        (9, "gmail.com", "UK", 60),
+        (10, "gmail.com", "UK", 70),
         # One country with 1 user
-        AnonymizedPerson(id=11, email_domain="gmail.com", country="Spain", age_group="[80-90]"),
+        (11, "gmail.com", "Spain", 80),
     ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
+
+    top_countries = get_top_gmail_countries(get_group_counts(db))
 
-    top_countries = get_top_gmail_countries(db)
-    
     # Should include all countries tied for positions within top 3
     assert len(top_countries) == 4  # USA, Germany (tied for 1st), France, UK (tied for 2nd)
-    
-    # Verify counts
-    country_dict = dict(top_countries)
-    assert country_dict["USA"] == 3
-    assert country_dict["Germany"] == 3
-    assert country_dict["France"] == 2
-    assert country_dict["UK"] == 2
-    # Spain should not be included as it's not tied with any top 3 position
-    assert "Spain" not in country_dict
+
+    # Verify counts - Spain should not be included as it's not tied with any top 3 position
+    assert set(top_countries) == {("USA", 3), ("Germany", 3), ("France", 2), ("UK", 2)}
 
 
 def test_top_gmail_countries_all_tied(db):
     """Test getting top countries when all have the same count."""
     test_data = [
         # All countries have exactly 2 users
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="gmail.com", country="USA", age_group="[40-50]"),
-        AnonymizedPerson(id=3, email_domain="gmail.com", country="Germany", age_group="[50-60]"),
-        AnonymizedPerson(id=4, email_domain="gmail.com", country="Germany", age_group="[60-70]"),
-        AnonymizedPerson(id=5, email_domain="gmail.com", country="France", age_group="[70-80]"),
-        AnonymizedPerson(id=6, email_domain="gmail.com", country="France", age_group="[80-90]"),
-        AnonymizedPerson(id=7, email_domain="gmail.com", country="UK", age_group="[30-40]"),
-        AnonymizedPerson(id=8, email_domain="gmail.com", country="UK", age_group="[40-50]"),
+        (1, "gmail.com", "USA", 30),
+        (2, "gmail.com", "USA", 40),
+        (3, "gmail.com", "Germany", 50),
+        (4, "gmail.com", "Germany", 60),
+        (5, "gmail.com", "France", 70),
+        (6, "gmail.com", "France", 80),
+        (7, "gmail.com", "UK", 30),
+        (8, "gmail.com", "UK", 40),
     ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
+
+    top_countries = get_top_gmail_countries(get_group_counts(db))
 
-    top_countries = get_top_gmail_countries(db)
-    
     # Should include all countries since they're all tied
     assert len(top_countries) == 4
     assert all(count == 2 for _, count in top_countries)
@@ -168,101 +119,133 @@ def test_top_gmail_countries_with_custom_limit(db):
     """Test getting top countries with a custom limit and ties."""
     test_data = [
         # First place (3 users)
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="gmail.com", country="USA", age_group="[40-50]"),
-        AnonymizedPerson(id=3, email_domain="gmail.com", country="USA", age_group="[50-60]"),
+        (1, "gmail.com", "USA", 30),
+        (2, "gmail.com", "USA", 40),
+        (3, "gmail.com", "USA", 50),
         # Tied for second (2 users each)
-        AnonymizedPerson(id=4, email_domain="gmail.com", country="Germany", age_group="[30-40]"),
-        AnonymizedPerson(id=5, email_domain="gmail.com", country="Germany", age_group="[40-50]"),
-        AnonymizedPerson(id=6, email_domain="gmail.com", country="France", age_group="[60-70]"),
-        AnonymizedPerson(id=7, email_domain="gmail.com", country="France", age_group="[70-80]"),
+        (4, "gmail.com", "Germany", 30),
+        (5, "gmail.com", "Germany", 40),
+        (6, "gmail.com", "France", 60),
+        (7, "gmail.com", "France", 70),
         # Third place (1 user)
-        AnonymizedPerson(id=8, email_domain="gmail.com", country="Spain", age_group="[80-90]"),
+        (8, "gmail.com", "Spain", 80),
     ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
 
     # Request top 2, but should get 3 due to tie
-    top_countries = get_top_gmail_countries(db, number_of_countries=2)
-    
+    top_countries = get_top_gmail_countries(get_group_counts(db), number_of_countries=2)
+
     assert len(top_countries) == 3  # USA, Germany, France
-    
-    country_dict = dict(top_countries)
-    assert country_dict["USA"] == 3
-    assert country_dict["Germany"] == 2
-    assert country_dict["France"] == 2
-    assert "Spain" not in country_dict
+
+    assert set(top_countries) == {("USA", 3), ("Germany", 2), ("France", 2)}  # Spain excluded
 
 
 def test_top_gmail_countries_empty_db(db):
     """Test getting top countries with empty database."""
-    top_countries = get_top_gmail_countries(db)
+    top_countries = get_top_gmail_countries(get_group_counts(db))
     assert top_countries == []
 
 
 def test_top_gmail_countries_no_gmail_users(db):
     """Test getting top countries when there are no Gmail users."""
     test_data = [
-        AnonymizedPerson(id=1, email_domain="outlook.com", country="USA", age_group="[30-40]"),
-        AnonymizedPerson(id=2, email_domain="yahoo.com", country="Germany", age_group="[40-50]"),
-        AnonymizedPerson(id=3, email_domain="hotmail.com", country="France", age_group="[50-60]"),
+        (1, "outlook.com", "USA", 30),
+        (2, "yahoo.com", "Germany", 40),
+        (3, "hotmail.com", "France", 50),
     ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
 
-    top_countries = get_top_gmail_countries(db)
+    top_countries = get_top_gmail_countries(get_group_counts(db))
     assert top_countries == []
 
 
-def test_count_gmail_users_over_60(db, sample_data):
-    """Test counting Gmail users over 60."""
-    count = count_gmail_users_over_60(db)
-    assert count == 3
-
-
 def test_count_gmail_users_over_60_edge_cases(db):
     """Test counting Gmail users over 60 with edge cases."""
     test_data = [
-        AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[60-70]"),  # Should count
-        AnonymizedPerson(id=2, email_domain="gmail.com", country="USA", age_group="[50-60]"),  # Should not count
-        AnonymizedPerson(id=3, email_domain="outlook.com", country="USA", age_group="[70-80]"),  # Wrong email
-        AnonymizedPerson(id=4, email_domain="gmail.com", country="USA", age_group="[90-100]"),  # Should count
+        (1, "gmail.com", "USA", 60),  # Should count
+        (2, "gmail.com", "USA", 50),  # Should not count
+        (3, "outlook.com", "USA", 70),  # Wrong email
+        (4, "gmail.com", "USA", 90),  # Should count
     ]
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
+    _insert_persons(db, test_data)
 
-    count = count_gmail_users_over_60(db)
-    assert count == 2  # Only [60-70] and [90-100] Gmail users
+    count = count_gmail_users_over_60(get_group_counts(db))
+    assert count == 2  # Only the 60 and 90 decade Gmail users
+
+
+def test_count_gmail_users_over_60_includes_centenarians(db):
+    """Test that the age_decade range filter also counts Gmail users aged 100 and older."""
+    test_data = [
+        (1, "gmail.com", "USA", 100),
+        (2, "gmail.com", "USA", 120),
+        (3, "gmail.com", "USA", None),
+    ]
+    _insert_persons(db, test_data)
+
+    assert count_gmail_users_over_60(get_group_counts(db)) == 2
 
 
 @pytest.mark.parametrize(
-    "test_data,expected_count",
+    "statistic,test_data,expected",
     [
-        ([], 0),  # Empty database
+        (calculate_gmail_users_germany_percentage, [], 0.0),  # Empty database
+        (
+            calculate_gmail_users_germany_percentage,
+            [  # No German users
+                (1, "gmail.com", "USA", 30),
+                (2, "outlook.com", "UK", 40),
+            ],
+            0.0,
+        ),
+        (count_gmail_users_over_60, [], 0),  # Empty database
         (
+            count_gmail_users_over_60,
             [  # Only under-60 users
-                AnonymizedPerson(id=1, email_domain="gmail.com", country="USA", age_group="[20-30]"),
-                AnonymizedPerson(id=2, email_domain="gmail.com", country="USA", age_group="[50-60]"),
+                (1, "gmail.com", "USA", 20),
+                (2, "gmail.com", "USA", 50),
             ],
             0,
         ),
         (
+            count_gmail_users_over_60,
             [  # Only non-Gmail users over 60
-                AnonymizedPerson(id=1, email_domain="outlook.com", country="USA", age_group="[60-70]"),
-                AnonymizedPerson(id=2, email_domain="yahoo.com", country="USA", age_group="[70-80]"),
+                (1, "outlook.com", "USA", 60),
+                (2, "yahoo.com", "USA", 70),
             ],
             0,
         ),
     ],
 )
-def test_count_gmail_users_over_60_zero_cases(db, test_data, expected_count):
-    """Test cases where no Gmail users over 60 exist."""
-    with db.transaction() as session:
-        for person in test_data:
-            session.add(person)
-
-    count = count_gmail_users_over_60(db)
-    assert count == expected_count
+def test_gmail_statistics_zero_result(db, statistic, test_data, expected):
+    """Test cases where no user matches a Gmail statistic."""
+    _insert_persons(db, test_data)
+
+    assert statistic(get_group_counts(db)) == expected
+
+
+def test_group_counts(db, sample_data):
+    """Test that a single aggregated scan groups persons by country, Gmail usage, and age group."""
+    group_counts = get_group_counts(db)
+    assert sum(group.num_persons for group in group_counts) == len(sample_data)
+    assert GroupCount("Germany", True, 30, 1) in group_counts
+    assert GroupCount("Germany", False, 20, 1) in group_counts
+    assert GroupCount("USA", True, 70, 1) in group_counts
+
+
+def test_generate_report(db_path, capsys):
+    """Test that the report prints all three statistics."""
+    db = create_db(get_db_url(db_path))
+    db.write_persons(
+        [
+            {"age_decade": 60, "email_domain": "gmail.com", "country": "Germany", "city": "Berlin"},
+            {"age_decade": 20, "email_domain": "yahoo.com", "country": "Germany", "city": "Munich"},
+        ]
+    )
+    db.engine.dispose()
+
+    generate_report(db_path)
+
+    report = capsys.readouterr().out
+    assert "50.00%" in report
+    assert "- Germany: 1 users" in report
+    assert "Number of users over 60 using Gmail:\n   1 users" in report
@@ -0,0 +1,39 @@
+"""Tests for pipeline helpers."""
+
+import threading
+
+import pytest
+
+from src.pipeline import iterate_in_background
+
+
+def test_iterate_in_background_preserves_order():
+    """Test that items are yielded in order from the background thread."""
+    assert list(iterate_in_background(range(100), maxsize=2)) == list(range(100))
+
+
+def test_iterate_in_background_empty():
+    """Test that an empty iterable yields nothing."""
+    assert list(iterate_in_background([])) == []
+
+
+def test_iterate_in_background_runs_producer_on_another_thread():
+    """Test that the producer is consumed off the calling thread."""
+
+    def producer():
+        yield threading.get_ident()
+
+    assert list(iterate_in_background(producer())) != [threading.get_ident()]
+
+
+def test_iterate_in_background_reraises_producer_error():
+    """Test that producer exceptions surface in the consumer after the items produced before them."""
+
+    def producer():
+        yield 1
+        raise RuntimeError("fetch failed")
+
+    items = iterate_in_background(producer())
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        next(items)